@@ -5,16 +5,55 @@ import os
 import numpy as np
 from openpmd_viewer.addons import LpaDiagnostics
 
+try:
+    from numba import njit
 
-def get_emittance(ts, t):
-    """Calculate the beam emittance at the given time step."""
-    w, x, ux = ts.get_particle(["w", "x", "ux"], t=t)
-    x2 = np.average(x**2, weights=w)
-    u2 = np.average(ux**2, weights=w)
-    xu = np.average(x * ux, weights=w)
+    numba_installed = True
+except ImportError:
+    numba_installed = False
+
+
+def _emittance(w, x, ux):
+    """Calculate the weighted beam emittance."""
+    sw = w.sum()
+    x2 = (w * x**2).sum() / sw
+    u2 = (w * ux**2).sum() / sw
+    xu = (w * x * ux).sum() / sw
     return np.sqrt(x2 * u2 - xu**2)
 
 
+def _mean_std_gamma(w, ux, uy, uz):
+    """Calculate the weighted mean and std of the Lorentz factor."""
+    sw = w.sum()
+    gamma = np.sqrt(1 + ux**2 + uy**2 + uz**2)
+    gamma_avg = (w * gamma).sum() / sw
+    gamma_std = np.sqrt((w * (gamma - gamma_avg) ** 2).sum() / sw)
+    return gamma_avg, gamma_std
+
+
+# If numba is available, compile the analysis kernels (the weighted sums over
+# all macroparticles are the compute-bound part of the analysis). The compiled
+# kernels are cached on disk, so they are only compiled once.
+if numba_installed:
+    _emittance = njit(fastmath=True, cache=True)(_emittance)
+    _mean_std_gamma = njit(fastmath=True, cache=True)(_mean_std_gamma)
+
+
+def get_beam_properties(ts, t):
+    """Calculate the beam charge, emittance and energy at the given time step.
+
+    All quantities are computed from a single `get_particle` call, so that
+    the openPMD files of the time step are read only once.
+    """
+    w, x, ux, uy, uz, q = ts.get_particle(
+        ["w", "x", "ux", "uy", "uz", "charge"], t=t
+    )
+    charge = np.sum(w * q)
+    emittance = _emittance(w, x, ux)
+    gamma_avg, gamma_std = _mean_std_gamma(w, ux, uy, uz)
+    return charge, emittance, gamma_avg, gamma_std
+
+
 def analyze_simulation(simulation_directory, output_params):
     """Analyze the output of the WarpX simulation.
 
@@ -24,11 +63,10 @@ def analyze_simulation(simulation_directory, output_params):
     ts = LpaDiagnostics(os.path.join(simulation_directory, "diag"))
     t0 = 4.0e-11  # Time (boosted-frame) at which we calculate beam properties.
 
-    charge_i = ts.get_charge(t=0)
-    emittance_i = get_emittance(ts, t=0)
-    charge_f = ts.get_charge(t=t0)
-    emittance_f = get_emittance(ts, t=t0)
-    energy_avg, energy_std = ts.get_mean_gamma(t=t0)
+    charge_i, emittance_i, _, _ = get_beam_properties(ts, t=0)
+    charge_f, emittance_f, energy_avg, energy_std = get_beam_properties(
+        ts, t=t0
+    )
 
     # Here: Build a quantity to minimize (f) that encompasses
     # emittance AND charge loss 1% charge loss has the
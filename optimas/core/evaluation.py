@@ -20,6 +20,10 @@ class Evaluation:
         The observation noise of the evaluation.
     """
 
+    # Use slots to reduce the memory footprint (one evaluation is created
+    # per objective and analyzed parameter of every trial).
+    __slots__ = ("_parameter", "_value", "_sem")
+
     def __init__(
         self, parameter: Parameter, value: float, sem: Optional[float] = None
     ) -> None:
@@ -42,6 +42,24 @@ class Trial:
 
     """
 
+    # Use slots to reduce the memory footprint of each trial (no per-instance
+    # `__dict__`), since a long-running exploration can create a large number
+    # of them. Attributes that are not known in advance (e.g., the custom
+    # parameters or attributes set by the generators) are stored in the
+    # `_extra` dictionary, but can still be accessed as regular attributes.
+    __slots__ = (
+        "_varying_parameters",
+        "_objectives",
+        "_analyzed_parameters",
+        "_parameter_values",
+        "_index",
+        "_custom_parameters",
+        "_mapped_evaluations",
+        "_status",
+        "ax_trial_id",
+        "_extra",
+    )
+
     def __init__(
         self,
         varying_parameters: List[VaryingParameter],
@@ -52,6 +70,9 @@ class Trial:
         index: Optional[int] = None,
         custom_parameters: Optional[List[TrialParameter]] = None,
     ) -> None:
+        # Initialize first, since it is needed to set any other attribute
+        # that is not included in the slots.
+        object.__setattr__(self, "_extra", {})
         # Process inputs.
         self._varying_parameters = varying_parameters
         self._objectives = objectives
@@ -79,6 +100,26 @@ class Trial:
             self._mapped_evaluations[ev.parameter.name] = ev
         self.mark_as(TrialStatus.CANDIDATE)
 
+    def __setattr__(self, name, value) -> None:
+        """Store attributes not included in the slots in `_extra`."""
+        if name in Trial.__slots__ or hasattr(type(self), name):
+            object.__setattr__(self, name, value)
+        else:
+            self._extra[name] = value
+
+    def __getattr__(self, name):
+        """Get attributes stored in `_extra`.
+
+        This method is only called when the normal attribute lookup (i.e.,
+        slots and properties) fails.
+        """
+        try:
+            return object.__getattribute__(self, "_extra")[name]
+        except KeyError:
+            raise AttributeError(
+                f"'{type(self).__name__}' object has no attribute '{name}'"
+            ) from None
+
     @property
     def varying_parameters(self) -> List[VaryingParameter]:
         """Get the list of varying parameters."""
@@ -223,6 +223,10 @@ class Exploration:
         n_evals_final = self.generator.n_evaluated_trials
         self._n_evals += n_evals_final - n_evals_initial
 
+        # Let the generator flush any pending operation (e.g., saving the
+        # model to file in the background).
+        self.generator.finalize()
+
         # Reset `cwd` to initial value before `libE` was called.
         os.chdir(cwd)
 
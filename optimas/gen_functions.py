@@ -50,6 +50,7 @@ def persistent_generator(H, persis_info, gen_specs, libE_info):
     generator = gen_specs["user"]["generator"]
     objectives = generator.objectives
     analyzed_parameters = generator.analyzed_parameters
+    varying_parameter_names = [var.name for var in generator.varying_parameters]
 
     ps = PersistentSupport(libE_info, EVAL_GEN_TAG)
 
@@ -72,10 +73,9 @@ def persistent_generator(H, persis_info, gen_specs, libE_info):
             generated_trials = generator.ask(1)
             if generated_trials:
                 trial = generated_trials[0]
-                for var, val in zip(
-                    trial.varying_parameters, trial.parameter_values
-                ):
-                    H_o[var.name][i] = val
+                # Write all varying parameters with a single multifield
+                # assignment instead of one assignment per parameter.
+                H_o[varying_parameter_names][i] = tuple(trial.parameter_values)
                 run_params = gen_specs["user"]["run_params"]
                 if "task" in H_o.dtype.names:
                     H_o["task"][i] = trial.trial_type
@@ -6,9 +6,7 @@ from typing import List, Dict, Tuple, Optional, Union
 
 import numpy as np
 import torch
-from packaging import version
 
-from ax.version import version as ax_version
 from ax.core.arm import Arm
 from ax.core.batch_trial import BatchTrial
 from ax.core.multi_type_experiment import MultiTypeExperiment
@@ -1,9 +1,17 @@
 """Contains the definition of the base Ax generator using the service API."""
 
 from typing import List, Optional, Dict
+from concurrent.futures import ThreadPoolExecutor
+import json
+import operator
 import os
 
+import numpy as np
+import pandas as pd
 import torch
+from ax.core.arm import Arm
+from ax.core.data import Data
+from ax.core.generator_run import GeneratorRun
 from ax.service.ax_client import AxClient
 from ax.service.utils.instantiation import (
     InstantiationBase,
@@ -11,6 +19,7 @@ from ax.service.utils.instantiation import (
     FixedFeatures,
 )
 from ax.modelbridge.registry import Models
+from ax.modelbridge.transition_criterion import MaxTrials
 from ax.modelbridge.generation_strategy import (
     GenerationStep,
     GenerationStrategy,
@@ -32,6 +41,16 @@ from optimas.utils.ax.other import (
 )
 
 
+def _dump_json_snapshot(snapshot: Dict, file_path: str) -> None:
+    """Write an Ax client json snapshot to file (runs on a worker thread)."""
+    # Write to a temporary file and rename it, so that the final file never
+    # contains a partially written snapshot.
+    tmp_path = file_path + ".tmp"
+    with open(tmp_path, "w") as file:
+        file.write(json.dumps(snapshot))
+    os.replace(tmp_path, file_path)
+
+
 class AxServiceGenerator(AxGenerator):
     """Base class for all Ax generators using the service API.
 
@@ -128,6 +147,22 @@ class AxServiceGenerator(AxGenerator):
         self._fixed_features = None
         self._parameter_constraints = parameter_constraints
         self._outcome_constraints = outcome_constraints
+        # Cache the parameter names and an `itemgetter` to extract the
+        # parameter values from the Ax parametrizations in `_ask` (the names
+        # never change, even if the parameters are updated).
+        self._vp_names = tuple(var.name for var in self._varying_parameters)
+        self._vp_getter = operator.itemgetter(*self._vp_names)
+        # Executor (created on first use) and pending future of the
+        # background thread that saves the model to file.
+        self._save_executor = None
+        self._save_future = None
+        # Sobol engine (created on first use) with which the initialization
+        # trials are drawn in batches.
+        self._sobol_engine = None
+        # Whether the generation strategy of the Ax client was created by
+        # optimas (set by `_create_ax_client`, i.e., `False` if the client
+        # was supplied by the user).
+        self._optimas_generation_strategy = False
         self._ax_client = self._create_ax_client()
         self._model = AxModelManager(self._ax_client)
 
@@ -143,68 +178,202 @@ class AxServiceGenerator(AxGenerator):
 
     def _ask(self, trials: List[Trial]) -> List[Trial]:
         """Fill in the parameter values of the requested trials."""
-        for trial in trials:
-            parameters, trial_id = self._ax_client.get_next_trial(
-                fixed_features=self._fixed_features
+        pending_trials = trials
+        if pending_trials and self._use_sobol_shortcut():
+            # Draw as many initialization trials as possible in a single
+            # batch with a Sobol engine, instead of one by one through the
+            # generation strategy.
+            pending_trials = self._ask_sobol(pending_trials)
+        if not pending_trials:
+            return trials
+        if hasattr(self._ax_client, "get_next_trials"):
+            # Request all trials in a single call, so that the model fitting
+            # and acquisition optimization are amortized over the whole batch
+            # (the candidates are still generated with sequential
+            # conditioning inside Ax).
+            parametrizations, _ = self._ax_client.get_next_trials(
+                max_trials=len(pending_trials),
+                fixed_features=self._fixed_features,
             )
-            trial.parameter_values = [
-                parameters.get(var.name) for var in self._varying_parameters
-            ]
-            trial.ax_trial_id = trial_id
+            # Fewer parametrizations than requested trials can be returned
+            # (e.g., if the maximum parallelism is reached). The trials that
+            # did not get data are discarded by the base `ask` method.
+            for trial, (trial_id, parameters) in zip(
+                pending_trials, parametrizations.items()
+            ):
+                trial.parameter_values = self._extract_parameter_values(
+                    parameters
+                )
+                trial.ax_trial_id = trial_id
+        else:
+            # Fall back to one call per trial for older Ax versions without
+            # `get_next_trials`.
+            for trial in pending_trials:
+                parameters, trial_id = self._ax_client.get_next_trial(
+                    fixed_features=self._fixed_features
+                )
+                trial.parameter_values = self._extract_parameter_values(
+                    parameters
+                )
+                trial.ax_trial_id = trial_id
         return trials
 
+    def _extract_parameter_values(self, parameters: Dict) -> List:
+        """Get the values of the varying parameters from a parametrization."""
+        # `itemgetter` returns a scalar when built with a single name.
+        if len(self._vp_names) == 1:
+            return [self._vp_getter(parameters)]
+        return list(self._vp_getter(parameters))
+
+    def _use_sobol_shortcut(self) -> bool:
+        """Determine whether the next trials can be drawn with a Sobol engine.
+
+        The shortcut can only be used with a generation strategy created by
+        optimas (a user-supplied client might, e.g., enforce the number of
+        trials generated by each step or have parameter constraints in its
+        search space), and only while the strategy is in the Sobol step and
+        the drawn points do not need any processing that the engine cannot
+        do (i.e., there are no parameter constraints and all parameters are
+        floats that are neither fixed nor fidelities).
+        """
+        if not self._optimas_generation_strategy:
+            return False
+        if self._parameter_constraints:
+            return False
+        for var in self._varying_parameters:
+            if var.is_fixed or var.is_fidelity:
+                return False
+            if np.dtype(var.dtype).kind != "f":
+                return False
+        current_step = self._ax_client.generation_strategy.current_step
+        if current_step.model != Models.SOBOL:
+            return False
+        criteria = current_step.transition_criteria
+        if not criteria or not isinstance(criteria[0], MaxTrials):
+            return False
+        return criteria[0].threshold > 0
+
+    def _ask_sobol(self, trials: List[Trial]) -> List[Trial]:
+        """Draw Sobol points for the given trials in a single batch.
+
+        The points are drawn directly with a `SobolEngine` and attached to
+        the Ax client, which is much faster than generating them one by one
+        with the generation strategy. The trials that exceed the number of
+        Sobol trials left in the generation strategy are returned, so that
+        they can be generated through the usual path.
+        """
+        generation_strategy = self._ax_client.generation_strategy
+        current_step = generation_strategy.current_step
+        criterion = current_step.transition_criteria[0]
+        n_sobol = min(len(trials), criterion.threshold)
+        if self._sobol_engine is None:
+            self._sobol_engine = torch.quasirandom.SobolEngine(
+                dimension=len(self._varying_parameters), scramble=True
+            )
+        points = self._sobol_engine.draw(n_sobol, dtype=torch.double).numpy()
+        # Denormalize the points from [0, 1) to the parameter ranges.
+        lower_bounds = np.array(
+            [var.lower_bound for var in self._varying_parameters]
+        )
+        upper_bounds = np.array(
+            [var.upper_bound for var in self._varying_parameters]
+        )
+        points = lower_bounds + (upper_bounds - lower_bounds) * points
+        for trial, point in zip(trials, points):
+            parameter_values = point.tolist()
+            # Attach the point with a "Sobol" generator run, so that the
+            # trial is indistinguishable from one generated by the Sobol
+            # step (e.g., in the trials dataframe of the Ax client).
+            generator_run = GeneratorRun(
+                arms=[
+                    Arm(parameters=dict(zip(self._vp_names, parameter_values)))
+                ],
+                model_key="Sobol",
+            )
+            ax_trial = self._ax_client.experiment.new_trial(generator_run)
+            ax_trial.mark_running(no_runner_required=True)
+            trial.parameter_values = parameter_values
+            trial.ax_trial_id = ax_trial.index
+            # Since the trials are attached and not generated, reduce the
+            # number of Sobol trials the generation strategy has left.
+            criterion.threshold -= 1
+        generation_strategy._maybe_move_to_next_step()
+        return trials[n_sobol:]
+
     def _tell(self, trials: List[Trial]) -> None:
         """Incorporate evaluated trials into Ax client."""
+        completed_records = []
+        completed_ax_trials = []
         for trial in trials:
-            try:
-                trial_id = trial.ax_trial_id
+            trial_id = getattr(trial, "ax_trial_id", None)
+            if trial_id is not None:
                 ax_trial = self._ax_client.get_trial(trial_id)
-            except AttributeError:
-                params = {}
-                for var, value in zip(
-                    trial.varying_parameters, trial.parameter_values
-                ):
-                    params[var.name] = value
-                _, trial_id = self._ax_client.attach_trial(params)
-                ax_trial = self._ax_client.get_trial(trial_id)
-
-                # Since data was given externally, reduce number of
-                # initialization trials, but only if they have not failed.
-                if (
-                    trial.status != TrialStatus.FAILED
-                    and not self._enforce_n_init
-                ):
-                    generation_strategy = self._ax_client.generation_strategy
-                    current_step = generation_strategy.current_step
-                    # Reduce only if there are still Sobol trials left.
-                    if current_step.model == Models.SOBOL:
-                        current_step.transition_criteria[0].threshold -= 1
-                        generation_strategy._maybe_move_to_next_step()
-            finally:
-                if trial.completed:
-                    outcome_evals = {}
-                    # Add objective evaluations.
-                    for ev in trial.objective_evaluations:
-                        outcome_evals[ev.parameter.name] = (ev.value, ev.sem)
-                    # Add outcome constraints evaluations.
-                    ax_config = self._ax_client.experiment.optimization_config
-                    if ax_config.outcome_constraints:
-                        ocs = [
-                            oc.metric.name
-                            for oc in ax_config.outcome_constraints
-                        ]
-                        for ev in trial.parameter_evaluations:
-                            par_name = ev.parameter.name
-                            if par_name in ocs:
-                                outcome_evals[par_name] = (ev.value, ev.sem)
-                    self._ax_client.complete_trial(
-                        trial_index=trial_id, raw_data=outcome_evals
+            else:
+                # The trial was created externally (e.g., from attached
+                # evaluations), so attach it to the Ax client.
+                trial_id, ax_trial = self._attach_external_trial(trial)
+            if trial.completed:
+                outcome_evals = {}
+                # Add objective evaluations.
+                for ev in trial.objective_evaluations:
+                    outcome_evals[ev.parameter.name] = (ev.value, ev.sem)
+                # Add outcome constraints evaluations.
+                ax_config = self._ax_client.experiment.optimization_config
+                if ax_config.outcome_constraints:
+                    ocs = [
+                        oc.metric.name for oc in ax_config.outcome_constraints
+                    ]
+                    for ev in trial.parameter_evaluations:
+                        par_name = ev.parameter.name
+                        if par_name in ocs:
+                            outcome_evals[par_name] = (ev.value, ev.sem)
+                arm_name = ax_trial.arm.name
+                for metric_name, (mean, sem) in outcome_evals.items():
+                    completed_records.append(
+                        {
+                            "arm_name": arm_name,
+                            "metric_name": metric_name,
+                            "mean": mean,
+                            "sem": np.nan if sem is None else sem,
+                            "trial_index": trial_id,
+                        }
                     )
-                elif trial.failed:
-                    if self._abandon_failed_trials:
-                        ax_trial.mark_abandoned()
-                    else:
-                        ax_trial.mark_failed()
+                completed_ax_trials.append(ax_trial)
+            elif trial.failed:
+                if self._abandon_failed_trials:
+                    ax_trial.mark_abandoned()
+                else:
+                    ax_trial.mark_failed()
+        if completed_records:
+            # Attach the data of all completed trials to the experiment in a
+            # single call and then mark the trials as completed, instead of
+            # completing the trials one by one (each call to `complete_trial`
+            # attaches the data of a single trial).
+            data = Data(df=pd.DataFrame.from_records(completed_records))
+            self._ax_client.experiment.attach_data(
+                data, combine_with_last_data=True
+            )
+            for ax_trial in completed_ax_trials:
+                ax_trial.mark_completed()
+
+    def _attach_external_trial(self, trial: Trial):
+        """Attach an externally evaluated trial to the Ax client."""
+        params = {}
+        for var, value in zip(trial.varying_parameters, trial.parameter_values):
+            params[var.name] = value
+        _, trial_id = self._ax_client.attach_trial(params)
+        ax_trial = self._ax_client.get_trial(trial_id)
+
+        # Since data was given externally, reduce number of
+        # initialization trials, but only if they have not failed.
+        if trial.status != TrialStatus.FAILED and not self._enforce_n_init:
+            generation_strategy = self._ax_client.generation_strategy
+            current_step = generation_strategy.current_step
+            # Reduce only if there are still Sobol trials left.
+            if current_step.model == Models.SOBOL:
+                current_step.transition_criteria[0].threshold -= 1
+                generation_strategy._maybe_move_to_next_step()
+        return trial_id, ax_trial
 
     def _create_ax_client(self) -> AxClient:
         """Create Ax client."""
@@ -225,17 +394,21 @@ class AxServiceGenerator(AxGenerator):
             outcome_constraints=self._outcome_constraints,
             parameter_constraints=self._parameter_constraints,
         )
+        self._optimas_generation_strategy = True
         return ax_client
 
     def _create_ax_parameters(self) -> List:
         """Create list of parameters to pass to an Ax."""
         parameters = convert_optimas_to_ax_parameters(self.varying_parameters)
-        fixed_parameters = {}
+        # Keep the parameter dicts, so that `_update_parameter` can convert
+        # a single parameter without rebuilding the whole list.
+        self._ax_param_dicts = {p["name"]: p for p in parameters}
+        self._fixed_parameters = {}
         for var in self._varying_parameters:
             if var.is_fixed:
-                fixed_parameters[var.name] = var.default_value
+                self._fixed_parameters[var.name] = var.default_value
         # Store fixed parameters as fixed features.
-        self._fixed_features = FixedFeatures(fixed_parameters)
+        self._fixed_features = FixedFeatures(self._fixed_parameters)
         return parameters
 
     def _create_ax_objectives(self) -> Dict[str, ObjectiveProperties]:
@@ -266,13 +439,39 @@ class AxServiceGenerator(AxGenerator):
 
     def _save_model_to_file(self) -> None:
         """Save Ax client to json file."""
-        file_path = os.path.join(
-            self._model_history_dir,
-            "ax_client_at_eval_{}.json".format(
-                self._n_evaluated_trials_last_saved
-            ),
+        # Resolve the path on the calling thread, because the current
+        # directory might have changed by the time the write runs.
+        file_path = os.path.abspath(
+            os.path.join(
+                self._model_history_dir,
+                "ax_client_at_eval_{}.json".format(
+                    self._n_evaluated_trials_last_saved
+                ),
+            )
+        )
+        # Take the snapshot on the calling thread (a fast, in-memory
+        # operation) and write it to file in the background, so that the
+        # ask/tell loop is not blocked by the disk I/O. The single-worker
+        # executor runs the writes one by one, in order, so waiting for the
+        # last future (in `finalize`) covers all earlier ones.
+        snapshot = self._ax_client.to_json_snapshot()
+        if self._save_executor is None:
+            self._save_executor = ThreadPoolExecutor(max_workers=1)
+        if self._save_future is not None and self._save_future.done():
+            # Raise any error from the previous write.
+            self._save_future.result()
+        self._save_future = self._save_executor.submit(
+            _dump_json_snapshot, snapshot, file_path
         )
-        self._ax_client.save_to_json_file(file_path)
+
+    def finalize(self) -> None:
+        """Wait until any pending model save has finished.
+
+        This ensures that the last model file exists when the exploration
+        run finishes, and raises any error from the background write.
+        """
+        if self._save_future is not None:
+            self._save_future.result()
 
     def _update_parameter(self, parameter):
         """Update a parameter from the search space."""
@@ -281,11 +480,26 @@ class AxServiceGenerator(AxGenerator):
         generation_strategy = self._ax_client.generation_strategy
         if generation_strategy._model is not None:
             del generation_strategy._curr.model_spec._fitted_model
-        parameters = self._create_ax_parameters()
-        new_search_space = InstantiationBase.make_search_space(parameters, None)
+        # If the Ax client was supplied by the user, the parameter dicts have
+        # not been built yet (the experiment was not created by optimas), so
+        # build them first.
+        if not hasattr(self, "_ax_param_dicts"):
+            self._create_ax_parameters()
+        # Update only the dict of the given parameter, instead of rebuilding
+        # the whole list of parameters and search space.
+        param_dict = self._ax_param_dicts[parameter.name]
+        param_dict["bounds"] = [parameter.lower_bound, parameter.upper_bound]
+        param_dict["target_value"] = parameter.fidelity_target_value
         self._ax_client.experiment.search_space.update_parameter(
-            new_search_space.parameters[parameter.name]
+            InstantiationBase.parameter_from_json(param_dict)
         )
+        # Update the fixed features, in case the parameter has been fixed
+        # or freed.
+        if parameter.is_fixed:
+            self._fixed_parameters[parameter.name] = parameter.default_value
+        else:
+            self._fixed_parameters.pop(parameter.name, None)
+        self._fixed_features = FixedFeatures(self._fixed_parameters)
 
     def _mark_trial_as_failed(self, trial: Trial):
         """Mark a trial as failed so that is not used for fitting the model."""
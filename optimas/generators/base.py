@@ -509,6 +509,14 @@ class Generator:
                 )
             )
 
+    def finalize(self) -> None:
+        """Finalize the generator at the end of an exploration run.
+
+        Can be overridden by the subclasses to flush any pending operation
+        (by default, it does nothing).
+        """
+        pass
+
     def get_gen_specs(
         self, sim_workers: int, run_params: Dict, max_evals: int
     ) -> Dict:
@@ -1,16 +1,62 @@
 """Contains the definition of the simulation functions given to libEnsemble."""
 
+import time
+
 import jinja2
 import numpy as np
 
-from libensemble.executors.executor import Executor
-from libensemble.message_numbers import WORKER_DONE, TASK_FAILED
+from libensemble.executors.executor import Executor, ExecutorException
+from libensemble.message_numbers import (
+    UNSET_TAG,
+    WORKER_DONE,
+    TASK_FAILED,
+    TASK_FAILED_TO_START,
+    WORKER_KILL_ON_TIMEOUT,
+)
 
 from optimas.core.trial import TrialStatus
 from optimas.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Environment used to render the simulation templates. Templates are located
+# relative to the current simulation directory and cached by file name, so
+# that each worker reads and parses a given template only once (all
+# simulation directories get an identical copy of the template). Disable
+# auto-reloading so that cached templates are reused without checking the
+# file on disk (which is overwritten with the rendered script).
+_template_env = jinja2.Environment(
+    loader=jinja2.FileSystemLoader("."),
+    keep_trailing_newline=True,
+    auto_reload=False,
+)
+
+
+# Template (keyed by dtype) of the output array returned to libE, so that
+# the structured dtype is parsed and the array NaN-initialized only once.
+_libE_output_template = None
+
+
+def _get_libe_output(sim_specs):
+    """Get the NaN-initialized output array that is returned to libE."""
+    global _libE_output_template
+    dtype = np.dtype(sim_specs["out"])
+    if _libE_output_template is None or _libE_output_template.dtype != dtype:
+        template = np.zeros(1, dtype=dtype)
+        for name in template.dtype.names:
+            template[name].fill(np.nan)
+        _libE_output_template = template
+    return _libE_output_template.copy()
+
+
+def _get_input_values(H):
+    """Get the dict of inputs to the evaluation from the libE history row."""
+    input_values = dict(zip(H.dtype.names, H[0]))
+    for name, value in input_values.items():
+        if isinstance(value, str):
+            input_values[name] = "'{}'".format(value)
+    return input_values
+
 
 def run_template_simulation(H, persis_info, sim_specs, libE_info):
     """Run a simulation defined with a `TemplateEvaluator` or `ChainEvaluator`.
@@ -23,17 +69,10 @@ def run_template_simulation(H, persis_info, sim_specs, libE_info):
     # By default, indicate that task failed
     calc_status = TASK_FAILED
 
-    input_values = {}
-    for name in H.dtype.names:
-        value = H[name][0]
-        if isinstance(value, str):
-            value = "'{}'".format(value)
-        input_values[name] = value
+    input_values = _get_input_values(H)
 
     # Prepare the array that is returned to libE
-    libE_output = np.zeros(1, dtype=sim_specs["out"])
-    for name in libE_output.dtype.names:
-        libE_output[name].fill(np.nan)
+    libE_output = _get_libe_output(sim_specs)
 
     # Get user specs.
     if "task" in H.dtype.names:
@@ -100,11 +139,10 @@ def execute_and_analyze_simulation(
     stderr,
 ):
     """Run simulation, handle outcome and analyze results."""
-    # Create simulation input file.
-    with open(sim_template, "r") as f:
-        template = jinja2.Template(f.read(), keep_trailing_newline=True)
-    with open(sim_template, "w") as f:
-        f.write(template.render(input_values))
+    # Create simulation input file. The rendered template is streamed to
+    # disk in chunks, without building the full script in memory.
+    template = _template_env.get_template(sim_template)
+    template.stream(input_values).dump(sim_template)
 
     # If the template is a python file, no need to provide it as argument
     # (it has already been registered by libEnsemble as such).
@@ -123,7 +161,7 @@ def execute_and_analyze_simulation(
         mpi_runner_type=mpi_runner_type,
     )
 
-    calc_status = Executor.executor.polling_loop(task, timeout=timeout)
+    calc_status = _polling_loop(task, timeout=timeout)
 
     # Data analysis from the last simulation
     if calc_status == WORKER_DONE:
@@ -135,14 +173,48 @@ def execute_and_analyze_simulation(
     return calc_status
 
 
+def _polling_loop(task, timeout=None):
+    """Poll a simulation task until completion and return its status.
+
+    This is equivalent to the `polling_loop` of the libEnsemble executor,
+    except that the delay between polls grows exponentially (up to a maximum
+    of 10 s) instead of being fixed. Since the tasks launched by optimas are
+    typically long-running simulations, this avoids waking up the worker
+    process several times per second just to check on a task that will run
+    for minutes or hours.
+    """
+    delay = 0.1
+    max_delay = 10.0
+    calc_status = UNSET_TAG
+    while not task.finished:
+        try:
+            task.poll()
+        except ExecutorException:
+            break
+        if timeout is not None and task.runtime > timeout:
+            task.kill()
+            calc_status = WORKER_KILL_ON_TIMEOUT
+            break
+        if timeout is not None:
+            # Do not sleep (much) past the timeout.
+            delay = min(delay, max(timeout - task.runtime, 0.1))
+        time.sleep(delay)
+        delay = min(delay * 1.5, max_delay)
+
+    if calc_status == UNSET_TAG:
+        if task.state == "FINISHED":
+            calc_status = WORKER_DONE
+        elif task.state == "FAILED_TO_START":
+            calc_status = TASK_FAILED_TO_START
+        elif task.state == "FAILED":
+            calc_status = TASK_FAILED
+
+    return calc_status
+
+
 def run_function(H, persis_info, sim_specs, libE_info):
     """Run an evaluation defined with a `FunctionEvaluator`."""
-    input_values = {}
-    for name in H.dtype.names:
-        value = H[name][0]
-        if isinstance(value, str):
-            value = "'{}'".format(value)
-        input_values[name] = value
+    input_values = _get_input_values(H)
 
     # Get user specs.
     if "task" in H.dtype.names:
@@ -153,9 +225,7 @@ def run_function(H, persis_info, sim_specs, libE_info):
     evaluation_func = user_specs["evaluation_func"]
 
     # Prepare the array that is returned to libE
-    libE_output = np.zeros(1, dtype=sim_specs["out"])
-    for name in libE_output.dtype.names:
-        libE_output[name].fill(np.nan)
+    libE_output = _get_libe_output(sim_specs)
 
     # Run evaluation.
     evaluation_func(input_values, libE_output[0])
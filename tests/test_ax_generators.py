@@ -14,7 +14,13 @@ from optimas.generators import (
     AxClientGenerator,
 )
 from optimas.evaluators import FunctionEvaluator, MultitaskEvaluator
-from optimas.core import VaryingParameter, Objective, Task, Parameter
+from optimas.core import (
+    VaryingParameter,
+    Objective,
+    Task,
+    Parameter,
+    Evaluation,
+)
 
 
 # Some tests will use threading (instead of multiprocessing) to be able to
@@ -806,6 +812,44 @@ def test_ax_service_init():
     df["generation_method"][n_external + n_init] == "GPEI"
 
 
+def test_ax_service_model_save_cwd_change():
+    """
+    Test that a pending background model save is flushed to the correct
+    directory even if the working directory changes after the save is
+    requested (as done by `Exploration.run`).
+    """
+
+    var1 = VaryingParameter("x0", -50.0, 5.0)
+    var2 = VaryingParameter("x1", -5.0, 15.0)
+    obj = Objective("f", minimize=False)
+
+    cwd = os.getcwd()
+    save_dir = "./tests_output/test_ax_service_model_save_cwd_change"
+    os.makedirs(save_dir, exist_ok=True)
+    os.chdir(save_dir)
+    try:
+        gen = AxSingleFidelityGenerator(
+            varying_parameters=[var1, var2], objectives=[obj], n_init=4
+        )
+        # Evaluate as many trials as the model save period, so that a model
+        # save is requested by the last `tell`.
+        for _ in range(5):
+            trial = gen.ask(1)[0]
+            x0, x1 = trial.parameter_values
+            result = -(x0 + 10 * np.cos(x0)) * (x1 + 5 * np.cos(x1))
+            trial.complete_evaluation(Evaluation(parameter=obj, value=result))
+            gen.tell([trial])
+        # Change directory while the save might still be pending, and check
+        # that the model file appears in the original directory.
+        os.chdir(cwd)
+        gen.finalize()
+        assert os.path.exists(
+            os.path.join(save_dir, "model_history", "ax_client_at_eval_5.json")
+        )
+    finally:
+        os.chdir(cwd)
+
+
 if __name__ == "__main__":
     test_ax_single_fidelity()
     test_ax_single_fidelity_int()
@@ -820,3 +864,4 @@ if __name__ == "__main__":
     test_ax_multi_fidelity_with_history()
     test_ax_multitask_with_history()
     test_ax_service_init()
+    test_ax_service_model_save_cwd_change()